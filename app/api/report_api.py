@@ -1,45 +1,90 @@
 import uuid
 import os
-from fastapi import APIRouter, BackgroundTasks
-from app.services.report_service import generate_report
+from typing import Optional, Tuple
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from app.db import SessionLocal
+from app.models import ReportJob
+from app.services.report_service import CACHE_TTL_SECONDS, REPORT_FORMATS, get_cached_max_timestamp
+from app.utils.cache import InMemoryCache
 
 router = APIRouter()
 
-# In-memory store for report status
-report_status = {}
+# report_id of the latest report per max timestamp, so repeated triggers on
+# unchanged data reuse it instead of recomputing
+report_cache = InMemoryCache(ttl=CACHE_TTL_SECONDS)
+
+def _reuse_or_create_job(format: str) -> Tuple[str, Optional[str], Optional[tuple]]:
+    """(report_id, output_path, cache_key); output_path is None when a cached job is reused."""
+    max_ts = get_cached_max_timestamp()
+    cache_key = (max_ts.isoformat(), format) if max_ts is not None else None
+
+    db = SessionLocal()
+    try:
+        cached_id = report_cache.get(cache_key) if cache_key else None
+        if cached_id is not None:
+            job = db.get(ReportJob, cached_id)
+            if job is not None and job.status in ("Running", "Complete"):
+                return cached_id, None, cache_key
+
+        report_id = str(uuid.uuid4())
+        output_path = f"output/report_{report_id}.{format}"
+
+        # mark as running
+        db.add(ReportJob(id=report_id, status="Running"))
+        db.commit()
+    finally:
+        db.close()
+    return report_id, output_path, cache_key
 
 @router.post("/trigger_report")
-def trigger_report(background_tasks: BackgroundTasks):
-    report_id = str(uuid.uuid4())
-    output_path = f"output/report_{report_id}.csv"
+async def trigger_report(request: Request, format: str = "parquet"):
+    if format not in REPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(REPORT_FORMATS)}")
 
-    # mark as running
-    report_status[report_id] = {"status": "Running", "file": None}
+    # blocking DB work (which may wait on SQLite locks) stays off the event loop
+    report_id, output_path, cache_key = await run_in_threadpool(_reuse_or_create_job, format)
+    if output_path is None:
+        return {"report_id": report_id}
 
-    # Run report in background
-    background_tasks.add_task(run_report_task, report_id, output_path)
+    # Hand the report to the arq worker (app/worker.py). A job that never made it
+    # onto the queue is marked Failed and not cached, so the next trigger retries.
+    try:
+        await request.app.state.redis.enqueue_job("run_report_task", report_id, output_path, format)
+    except Exception as e:
+        await run_in_threadpool(_mark_failed, report_id, f"Could not queue report: {e}")
+        raise HTTPException(status_code=503, detail="Report queue unavailable")
+
+    if cache_key:
+        report_cache.set(cache_key, report_id)
 
     return {"report_id": report_id}
 
-def run_report_task(report_id: str, output_path: str):
+def _mark_failed(report_id: str, error: str):
+    db = SessionLocal()
     try:
-        path = generate_report(output_path)
-        report_status[report_id] = {"status": "Complete", "file": path}
-    except Exception as e:
-        report_status[report_id] = {"status": "Failed", "error": str(e)}
+        db.query(ReportJob).filter(ReportJob.id == report_id).update({"status": "Failed", "error": error})
+        db.commit()
+    finally:
+        db.close()
 
 @router.get("/get_report/{report_id}")
 def get_report(report_id: str):
-    if report_id not in report_status:
+    db = SessionLocal()
+    try:
+        job = db.get(ReportJob, report_id)
+    finally:
+        db.close()
+
+    if job is None:
         return {"error": "Invalid report_id"}
 
-    status_info = report_status[report_id]
-    if status_info["status"] == "Running":
+    if job.status == "Running":
         return {"status": "Running"}
-    elif status_info["status"] == "Complete":
+    elif job.status == "Complete":
         return {
             "status": "Complete",
-            "file": status_info["file"]
+            "file": job.file
         }
     else:
-        return {"status": "Failed", "error": status_info.get("error", "Unknown error")}
+        return {"status": "Failed", "error": job.error or "Unknown error"}
@@ -1,8 +1,18 @@
+from contextlib import asynccontextmanager
+from arq import create_pool
 from fastapi import FastAPI
 from app.db import Base, engine
 from app.api import report_api
+from app.worker import REDIS_SETTINGS
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Redis pool used to enqueue report jobs for the arq worker
+    app.state.redis = await create_pool(REDIS_SETTINGS)
+    yield
+    await app.state.redis.aclose()
+
+app = FastAPI(lifespan=lifespan)
 
 # Create tables
 Base.metadata.create_all(bind=engine)
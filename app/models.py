@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Time
+from sqlalchemy import Column, Integer, String, DateTime, Time, Index, func
 from app.db import Base
 
 # 1. Store status logs
@@ -9,6 +9,13 @@ class StoreStatus(Base):
     timestamp_utc = Column(DateTime, index=True)
     status = Column(String)   # "active" / "inactive"
 
+    __table_args__ = (
+        # range scan of one store's week window, already in timestamp order
+        Index("ix_status_store_ts", "store_id", "timestamp_utc"),
+        # lets Postgres answer MAX(timestamp_utc) from the top of the index
+        Index("ix_status_ts_desc", timestamp_utc.desc()).ddl_if(dialect="postgresql"),
+    )
+
 # 2. Business hours
 class BusinessHours(Base):
     __tablename__ = "business_hours"
@@ -18,9 +25,22 @@ class BusinessHours(Base):
     start_time_local = Column(Time)
     end_time_local = Column(Time)
 
+    __table_args__ = (
+        Index("ix_bh_store_dow", "store_id", "day_of_week"),
+    )
+
 # 3. Store timezone
 class StoreTimezone(Base):
     __tablename__ = "store_timezone"
     id = Column(Integer, primary_key=True, index=True)
     store_id = Column(String, index=True)
     timezone_str = Column(String)  # e.g. "America/Chicago"
+
+# 4. Report jobs (shared by every API worker, survives restarts)
+class ReportJob(Base):
+    __tablename__ = "report_job"
+    id = Column(String(36), primary_key=True, index=True)  # report_id (UUID)
+    status = Column(String, nullable=False)  # "Running" / "Complete" / "Failed"
+    file = Column(String, nullable=True)
+    error = Column(String, nullable=True)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
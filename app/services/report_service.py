@@ -1,55 +1,249 @@
+import csv
+import os
+import numpy as np
 import pandas as pd
-from datetime import timedelta, datetime, time, date
+from datetime import timedelta, datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from zoneinfo import ZoneInfo
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 from app.db import SessionLocal
 from app.models import StoreStatus, BusinessHours, StoreTimezone
-import pytz
-from typing import List, Tuple, Union, Dict
+from app.utils.cache import InMemoryCache
+from typing import List, Tuple, Dict, Iterable, Iterator, Optional
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the NumPy overlap path is used without it
+    njit = None
 
 def get_max_timestamp(db: Session) -> datetime:
     return db.query(func.max(StoreStatus.timestamp_utc)).scalar()
 
+@lru_cache(maxsize=1)
+def _max_ts_cached(bucket: int) -> datetime:
+    db = SessionLocal()
+    try:
+        return get_max_timestamp(db)
+    finally:
+        db.close()
+
+def get_cached_max_timestamp() -> datetime:
+    """MAX(timestamp_utc), re-queried at most once per wall-clock minute."""
+    return _max_ts_cached(int(datetime.now(timezone.utc).timestamp() // 60))
+
+def clear_max_timestamp_cache():
+    """Drop the cached MAX(timestamp_utc), e.g. after new status logs are ingested."""
+    _max_ts_cached.cache_clear()
+
 def get_all_store_timezones(db: Session) -> Dict[str, str]:
     rows = db.query(StoreTimezone).all()
     return {row.store_id: row.timezone_str for row in rows}
 
-def _normalize_to_time(v: Union[time, timedelta, str]) -> time:
-    if isinstance(v, time):
-        return v
-    if isinstance(v, timedelta):
-        total_seconds = int(v.total_seconds()) % (24 * 3600)
-        hh = total_seconds // 3600
-        mm = (total_seconds % 3600) // 60
-        ss = total_seconds % 60
-        return time(hh, mm, ss)
-    if isinstance(v, str):
-        return datetime.strptime(v, "%H:%M:%S").time()
-    raise TypeError(f"Unsupported type for business hour field: {type(v)}")
-
-def get_all_business_hours(db: Session) -> Dict[Tuple[str, int], List[Tuple[time, time]]]:
-    rows = db.query(BusinessHours).all()
-    hours = {}
-    for row in rows:
-        key = (row.store_id, row.day_of_week)
-        if key not in hours:
-            hours[key] = []
-        hours[key].append((_normalize_to_time(row.start_time_local), _normalize_to_time(row.end_time_local)))
-    return hours
-
-def _localize_naive(tz, d: date, t: time) -> datetime:
-    return tz.localize(datetime.combine(d, t))
-
-def calculate_uptime_downtime(store_id: str, logs_df: pd.DataFrame, now: datetime, tz_str: str,
-                               all_bh: Dict[Tuple[str, int], List[Tuple[time, time]]]) -> Dict:
-    tz = pytz.timezone(tz_str or "America/Chicago")
-    now_utc = pytz.UTC.localize(now) if now.tzinfo is None else now.astimezone(pytz.UTC)
-    now_local = now_utc.astimezone(tz)
-    hour_start_utc = now_utc - timedelta(hours=1)
-    day_start_utc = now_utc - timedelta(days=1)
-    week_start_utc = now_utc - timedelta(weeks=1)
-
-    if logs_df.empty:
+def _seconds_since_midnight(values: pd.Series) -> np.ndarray:
+    # time objects and "HH:MM:SS" strings parse alike; some drivers return
+    # timedeltas already. Fractional seconds are dropped.
+    td = values if pd.api.types.is_timedelta64_dtype(values) else pd.to_timedelta(values.astype(str))
+    return td.dt.total_seconds().to_numpy().astype(np.int64) % SECONDS_PER_DAY
+
+def get_all_business_hours(db: Session) -> pd.DataFrame:
+    """Business hours as store_id, day_of_week, start_sec, end_sec (seconds since local midnight)."""
+    rows = db.execute(select(
+        BusinessHours.store_id, BusinessHours.day_of_week,
+        BusinessHours.start_time_local, BusinessHours.end_time_local,
+    )).all()
+    df = pd.DataFrame(rows, columns=["store_id", "day_of_week", "start_time_local", "end_time_local"])
+    return pd.DataFrame({
+        "store_id": df["store_id"],
+        "day_of_week": df["day_of_week"].to_numpy(dtype=np.int64),
+        "start_sec": _seconds_since_midnight(df["start_time_local"]),
+        "end_sec": _seconds_since_midnight(df["end_time_local"]),
+    })
+
+SECONDS_PER_DAY = 24 * 3600
+NS_PER_SECOND = 1_000_000_000
+NS_PER_HOUR = 3600 * NS_PER_SECOND
+NS_PER_DAY = SECONDS_PER_DAY * NS_PER_SECOND
+
+DEFAULT_TIMEZONE = "America/Chicago"
+
+# Store status is polled roughly hourly, so results for a given max timestamp stay valid that long
+CACHE_TTL_SECONDS = 60 * 60
+
+# Per-store report rows keyed by (store_id, max timestamp ISO string)
+_store_cache = InMemoryCache(ttl=CACHE_TTL_SECONDS)
+
+# Parquet (snappy) for programmatic consumers; CSV kept for human review
+REPORT_FORMATS = ("parquet", "csv")
+
+REPORT_COLUMNS = (
+    "store_id",
+    "uptime_last_hour", "downtime_last_hour",
+    "uptime_last_day", "downtime_last_day",
+    "uptime_last_week", "downtime_last_week",
+)
+
+# Stores (or weekdays) without business hours are assumed open 00:00:00-23:59:59
+FULL_WEEK = np.tile(np.array([[0, SECONDS_PER_DAY - 1]], dtype=np.int64), (7, 1, 1))
+
+def build_business_hour_offsets(bh: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Stack each store's business hours into a (7, max_k, 2) int64 array of seconds since local midnight.
+
+    Row d holds weekday d's ranges, padded with empty (0, 0) ranges. A range
+    ending at or before its start crosses midnight: it is split into
+    (start, 23:59:59) on its own weekday and (00:00:00, end) on the next one.
+    """
+    last_second = SECONDS_PER_DAY - 1
+    dow = bh["day_of_week"].to_numpy()
+    start, end = bh["start_sec"].to_numpy(), bh["end_sec"].to_numpy()
+    cross = end <= start
+    stores, store_idx = np.unique(bh["store_id"].to_numpy(dtype=object), return_inverse=True)
+
+    # weekdays a store lists no hours for at all are open all day
+    listed = np.zeros((len(stores), 7), dtype=bool)
+    listed[store_idx, dow] = True
+    open_idx, open_dow = np.nonzero(~listed)
+
+    idx = np.concatenate([store_idx, store_idx[cross], open_idx])
+    day = np.concatenate([dow, (dow[cross] + 1) % 7, open_dow])
+    starts = np.concatenate([start, np.zeros(cross.sum(), dtype=np.int64), np.zeros(len(open_idx), dtype=np.int64)])
+    ends = np.concatenate([np.where(cross, last_second, end), end[cross], np.full(len(open_idx), last_second)])
+
+    # slot of each range within its (store, weekday) row
+    key = idx * 7 + day
+    slot = pd.Series(key).groupby(key).cumcount().to_numpy()
+    k_per_store = np.zeros(len(stores), dtype=np.int64)
+    np.maximum.at(k_per_store, idx, slot + 1)
+
+    stacked = np.zeros((len(stores), 7, int(k_per_store.max(initial=1)), 2), dtype=np.int64)
+    stacked[idx, day, slot, 0] = starts
+    stacked[idx, day, slot, 1] = ends
+    return {store_id: stacked[i, :, :k_per_store[i]] for i, store_id in enumerate(stores)}
+
+@lru_cache(maxsize=None)
+def _tz(name: str) -> ZoneInfo:
+    return ZoneInfo(name)
+
+def _to_ns(ts: datetime) -> int:
+    return pd.Timestamp(ts).value
+
+def build_utc_offset_table(tz_name: str, start: datetime, end: datetime) -> Tuple[np.ndarray, np.ndarray]:
+    """(transition_ns, offset_ns) of tz_name between the naive UTC datetimes start and end.
+
+    offset_ns[i] is the UTC offset in effect from instant transition_ns[i] on; the
+    first transition is the int64 minimum, so a fixed-offset zone is one entry.
+    Offsets are sampled on a 15-minute grid, which every DST rule in use lands on.
+    """
+    grid = pd.date_range(pd.Timestamp(start).floor("h"), end, freq="15min", tz="UTC", unit="ns")
+    offsets = grid.tz_convert(_tz(tz_name)).tz_localize(None).asi8 - grid.asi8
+    changes = np.flatnonzero(np.diff(offsets)) + 1
+    transition_ns = np.concatenate(([np.iinfo(np.int64).min], grid.asi8[changes]))
+    offset_ns = np.concatenate((offsets[:1], offsets[changes]))
+    return transition_ns, offset_ns
+
+def _offset_at(utc_ns, utc_offsets: Tuple[np.ndarray, np.ndarray]):
+    transition_ns, offset_ns = utc_offsets
+    return offset_ns[np.searchsorted(transition_ns, utc_ns, side="right") - 1]
+
+def _local_to_utc(local_ns: np.ndarray, utc_offsets: Tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+    # the offset looked up at (local - offset at local) is the one in effect at
+    # that wall time, except inside a DST gap/overlap where either is acceptable
+    return local_ns - _offset_at(local_ns - _offset_at(local_ns, utc_offsets), utc_offsets)
+
+def _business_hour_segments(first_day: int, last_day: int, week_offsets: np.ndarray) -> np.ndarray:
+    """Business-hour segments for local days [first_day, last_day] (days since epoch), as (n, 2) ns."""
+    days = np.arange(first_day, last_day + 1, dtype=np.int64)
+    weekdays = (days + 3) % 7  # 1970-01-01 was a Thursday
+    segments = days[:, None, None] * NS_PER_DAY + week_offsets[weekdays] * NS_PER_SECOND
+    return segments.reshape(-1, 2)
+
+def _candidate_segments(start_ns: np.ndarray, end_ns: np.ndarray,
+                        segments: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Union of the segments as sorted disjoint ranges, plus each observation's [seg_first, seg_stop).
+
+    Ranges can overlap: a cross-midnight spill lands on a next day that may be open
+    all day, or listed hours may overlap each other. Merging them keeps business
+    time from being counted twice. Only segments in [seg_first, seg_stop) can
+    overlap an observation, which restricts it to the one or two local days it
+    touches instead of the whole span.
+    """
+    segments = segments[segments[:, 1] > segments[:, 0]]
+    segments = segments[np.argsort(segments[:, 0], kind="stable")]
+    if len(segments):
+        # a new run starts wherever a range begins after every earlier one has ended
+        run_starts = np.flatnonzero(np.concatenate((
+            [True], segments[1:, 0] > np.maximum.accumulate(segments[:-1, 1]))))
+        segments = np.column_stack((segments[run_starts, 0], np.maximum.reduceat(segments[:, 1], run_starts)))
+    seg_first = np.searchsorted(segments[:, 1], start_ns, side="right")
+    seg_stop = np.searchsorted(segments[:, 0], end_ns, side="left")
+    return segments, seg_first, seg_stop
+
+def _overlap_numpy(start_ns: np.ndarray, end_ns: np.ndarray, is_active: np.ndarray, segments: np.ndarray,
+                   seg_first: np.ndarray, seg_stop: np.ndarray,
+                   wins_ns: np.ndarray, now_ns: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Active/inactive ns inside business-hour segments, per window start in wins_ns.
+
+    Observations must be sorted, so end_ns is too: only the tail of observations
+    ending after a window's start can overlap it. Each observation is paired with
+    its candidate segments only; the pairs are built once for the widest window
+    and narrower windows only sweep their own tail.
+    """
+    firsts = np.searchsorted(end_ns, wins_ns, side="right")
+    base = firsts.min()
+    counts = seg_stop[base:] - seg_first[base:]
+    pair_starts = np.concatenate(([0], np.cumsum(counts)))
+    obs = np.repeat(np.arange(base, start_ns.size), counts)
+    seg = np.repeat(seg_first[base:] - pair_starts[:-1], counts) + np.arange(pair_starts[-1])
+    # (observation, segment) overlap bounds, already capped at now
+    lo = np.maximum(start_ns[obs], segments[seg, 0])
+    hi = np.minimum(np.minimum(end_ns[obs], segments[seg, 1]), now_ns)
+    active = is_active[obs]
+    up = np.zeros(wins_ns.size, dtype=np.int64)
+    down = np.zeros(wins_ns.size, dtype=np.int64)
+    for w in range(wins_ns.size):
+        tail = slice(pair_starts[firsts[w] - base], None)
+        ov = np.maximum(0, hi[tail] - np.maximum(lo[tail], wins_ns[w]))
+        up[w] = np.where(active[tail], ov, 0).sum()
+        down[w] = np.where(active[tail], 0, ov).sum()
+    return up, down
+
+def _overlap_loop(start_ns, end_ns, is_active, segments, seg_first, seg_stop, wins_ns, now_ns):
+    # Same result as _overlap_numpy in a single pass with no temporaries;
+    # only worth running compiled.
+    firsts = np.searchsorted(end_ns, wins_ns, side="right")
+    up = np.zeros(wins_ns.size, dtype=np.int64)
+    down = np.zeros(wins_ns.size, dtype=np.int64)
+    for i in range(firsts.min(), start_ns.size):
+        end = min(end_ns[i], now_ns)
+        for j in range(seg_first[i], seg_stop[i]):
+            lo = max(start_ns[i], segments[j, 0])
+            hi = min(end, segments[j, 1])
+            if lo >= hi:
+                continue
+            for w in range(wins_ns.size):
+                if i < firsts[w]:
+                    continue
+                ov = hi - max(lo, wins_ns[w])
+                if ov > 0:
+                    if is_active[i]:
+                        up[w] += ov
+                    else:
+                        down[w] += ov
+    return up, down
+
+_overlap = njit(cache=True, fastmath=True)(_overlap_loop) if njit is not None else _overlap_numpy
+
+def calculate_uptime_downtime(store_id: str, ts_ns: np.ndarray, is_active: np.ndarray, now: datetime,
+                               utc_offsets: Tuple[np.ndarray, np.ndarray], week_offsets: np.ndarray) -> Dict:
+    """Uptime/downtime for one store from its observations.
+
+    ts_ns holds the sorted observation times as int64 UTC ns, is_active the
+    matching status flags, utc_offsets the store timezone as built by
+    build_utc_offset_table and week_offsets its business hours as built by
+    build_business_hour_offsets.
+    """
+    if ts_ns.size == 0:
         return {
             "store_id": store_id,
             "uptime_last_hour": 0, "downtime_last_hour": 0,
@@ -57,56 +251,32 @@ def calculate_uptime_downtime(store_id: str, logs_df: pd.DataFrame, now: datetim
             "uptime_last_week": 0, "downtime_last_week": 0,
         }
 
-    df = logs_df.copy()
-    df["timestamp_local"] = df["timestamp_utc"].dt.tz_localize("UTC").dt.tz_convert(tz)
-    df["next_time"] = df["timestamp_local"].shift(-1).fillna(now_local)
-
-    results = {
-        "store_id": store_id,
-        "uptime_last_hour": 0.0, "downtime_last_hour": 0.0,
-        "uptime_last_day": 0.0, "downtime_last_day": 0.0,
-        "uptime_last_week": 0.0, "downtime_last_week": 0.0,
-    }
-
-    for _, row in df.iterrows():
-        start_local, end_local = row["timestamp_local"], row["next_time"]
-        is_active = (row["status"] == "active")
-        day_cursor = start_local
-
-        while day_cursor.date() <= end_local.date():
-            dow = day_cursor.weekday()
-            bh_ranges = all_bh.get((store_id, dow), [(time(0, 0, 0), time(23, 59, 59))])
-            for bh_start, bh_end in bh_ranges:
-                segments = []
-                bh_start_local = _localize_naive(tz, day_cursor.date(), bh_start)
-                bh_end_local = _localize_naive(tz, day_cursor.date(), bh_end)
-
-                if bh_end_local <= bh_start_local:
-                    end_of_day = _localize_naive(tz, day_cursor.date(), time(23, 59, 59))
-                    segments.append((bh_start_local, end_of_day))
-                    next_day = (day_cursor + timedelta(days=1)).date()
-                    segments.append((_localize_naive(tz, next_day, time(0, 0, 0)), _localize_naive(tz, next_day, bh_end)))
-                else:
-                    segments.append((bh_start_local, bh_end_local))
-
-                for seg_start, seg_end in segments:
-                    overlap_start = max(start_local, seg_start)
-                    overlap_end = min(end_local, seg_end, now_local)
-                    if overlap_start < overlap_end:
-                        for _, win_start_utc, up_key, down_key, unit in [
-                            ("hour", hour_start_utc, "uptime_last_hour", "downtime_last_hour", 1),
-                            ("day", day_start_utc, "uptime_last_day", "downtime_last_day", 60),
-                            ("week", week_start_utc, "uptime_last_week", "downtime_last_week", 60),
-                        ]:
-                            win_start_local = win_start_utc.astimezone(tz)
-                            w_start = max(overlap_start, win_start_local)
-                            w_end = min(overlap_end, now_local)
-                            if w_start < w_end:
-                                minutes = (w_end - w_start).total_seconds() / 60.0
-                                results[up_key] += minutes / unit if is_active else 0
-                                results[down_key] += minutes / unit if not is_active else 0
-
-            day_cursor += timedelta(days=1)
+    # Each observation holds from its timestamp until the next one (the last until now).
+    # Overlap is the same whichever timezone it is measured in, so everything stays in
+    # int64 UTC ns; local time is only needed to place business hours on local days.
+    now_ns = _to_ns(now.replace(tzinfo=timezone.utc) if now.tzinfo is None else now)
+    start_ns = ts_ns
+    end_ns = np.empty_like(start_ns)
+    end_ns[:-1] = start_ns[1:]
+    end_ns[-1] = now_ns
+
+    # start a day early so a cross-midnight range from the previous day is covered too
+    first_day = int((start_ns[0] + _offset_at(start_ns[0], utc_offsets)) // NS_PER_DAY) - 1
+    last_day = int((now_ns + _offset_at(now_ns, utc_offsets)) // NS_PER_DAY)
+    segments = _local_to_utc(_business_hour_segments(first_day, last_day, week_offsets), utc_offsets)
+    segments, seg_first, seg_stop = _candidate_segments(start_ns, end_ns, segments)
+
+    wins_ns = now_ns - np.array([NS_PER_HOUR, NS_PER_DAY, 7 * NS_PER_DAY], dtype=np.int64)
+    up_ns, down_ns = _overlap(start_ns, end_ns, is_active, segments, seg_first, seg_stop, wins_ns, now_ns)
+
+    results = {"store_id": store_id}
+    for w, (up_key, down_key, unit) in enumerate([
+        ("uptime_last_hour", "downtime_last_hour", 1),
+        ("uptime_last_day", "downtime_last_day", 60),
+        ("uptime_last_week", "downtime_last_week", 60),
+    ]):
+        results[up_key] = float(up_ns[w]) / 60e9 / unit
+        results[down_key] = float(down_ns[w]) / 60e9 / unit
 
     for k in results:
         if k != "store_id":
@@ -114,34 +284,119 @@ def calculate_uptime_downtime(store_id: str, logs_df: pd.DataFrame, now: datetim
 
     return results
 
-def generate_report(output_path="output/report.csv"):
+def _store_worker(args: Tuple[str, np.ndarray, np.ndarray, Tuple[np.ndarray, np.ndarray], np.ndarray,
+                              datetime]) -> Dict:
+    store_id, ts_ns, is_active, utc_offsets, week_offsets, now = args
+    return calculate_uptime_downtime(store_id, ts_ns, is_active, now, utc_offsets, week_offsets)
+
+def _iter_report_rows(store_ids, cached_rows: List[Optional[Dict]], computed: Iterator[Dict],
+                      now_key: str) -> Iterator[List]:
+    # cached rows are used as-is; the rest come back from the pool in store order
+    for store_id, row in zip(store_ids, cached_rows):
+        if row is None:
+            row = next(computed)
+            _store_cache.set((store_id, now_key), row)
+        yield [row[col] for col in REPORT_COLUMNS]
+
+def _write_csv(output_path: str, rows: Iterable[List]):
+    # rows are written as they are produced, not collected into a DataFrame first
+    with open(output_path, "w", newline="", buffering=1 << 20) as f:
+        writer = csv.writer(f)
+        writer.writerow(REPORT_COLUMNS)
+        writer.writerows(rows)
+
+def _write_parquet(output_path: str, rows: Iterable[List]):
+    df = pd.DataFrame.from_records(rows, columns=list(REPORT_COLUMNS))
+    df.to_parquet(output_path, compression="snappy", engine="pyarrow", index=False)
+
+def load_store_logs(db: Session, week_start: datetime, now: datetime,
+                    batch_size: int = 50_000) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """store_id, timestamp_utc (int64 ns) and is_active arrays for logs in [week_start, now].
+
+    Rows are sorted by (store_id, timestamp_utc), which the interval math relies on
+    and the composite index serves directly. They are streamed from a server-side
+    cursor in batches straight into preallocated arrays, so neither ORM objects
+    nor the full result set are ever held in memory.
+    """
+    window = StoreStatus.timestamp_utc.between(week_start.replace(tzinfo=None), now.replace(tzinfo=None))
+    n = db.execute(select(func.count()).select_from(StoreStatus).where(window)).scalar()
+    store_ids = np.empty(n, dtype=object)
+    ts_ns = np.empty(n, dtype=np.int64)
+    is_active = np.empty(n, dtype=bool)
+
+    logs_query = select(
+        StoreStatus.store_id, StoreStatus.timestamp_utc, StoreStatus.status
+    ).where(window).order_by(StoreStatus.store_id, StoreStatus.timestamp_utc)
+    result = db.execute(logs_query, execution_options={"stream_results": True, "yield_per": batch_size})
+
+    pos = 0
+    for batch in result.partitions():
+        ids, timestamps, statuses = zip(*batch)
+        end = pos + len(batch)
+        if end > n:  # rows were back-filled after the count; grow the buffers
+            n = max(end, 2 * n)
+            store_ids, ts_ns, is_active = (np.resize(a, n) for a in (store_ids, ts_ns, is_active))
+        store_ids[pos:end] = ids
+        ts_ns[pos:end] = np.array(timestamps, dtype="datetime64[ns]").view("i8")
+        is_active[pos:end] = np.array(statuses, dtype=object) == "active"
+        pos = end
+    return store_ids[:pos], ts_ns[:pos], is_active[:pos]
+
+def generate_report(output_path="output/report.parquet", format="parquet"):
+    """Write the uptime/downtime report as Parquet (default) or CSV; returns the file path.
+
+    The extension of output_path is replaced to match format.
+    """
+    if format not in REPORT_FORMATS:
+        raise ValueError(f"Unsupported report format: {format}")
+    output_path = f"{os.path.splitext(output_path)[0]}.{format}"
+
     db = SessionLocal()
     try:
-        now = get_max_timestamp(db)
+        now = get_cached_max_timestamp()
 
         # Optimization 1: load all logs at once (reduce per-store DB call)
         week_start = now - timedelta(weeks=1)
-        logs = db.query(StoreStatus).filter(
-            StoreStatus.timestamp_utc >= week_start.replace(tzinfo=None)
-        ).all()
-        logs_df = pd.DataFrame([{
-            "store_id": l.store_id,
-            "timestamp_utc": l.timestamp_utc,
-            "status": l.status
-        } for l in logs])
+        all_store_ids, ts_ns, is_active = load_store_logs(db, week_start, now)
 
         # Optimization 2: preload all timezones and business hours
         tz_map = get_all_store_timezones(db)
-        all_bh = get_all_business_hours(db)
+        bh_offsets = build_business_hour_offsets(get_all_business_hours(db))
+
+        # Per-store work is independent and CPU bound: shard it by store across
+        # processes and hand each row to the writer as it comes back, in store order.
+        # Rows only depend on the store and the max timestamp, so stores already
+        # computed for this `now` are served from cache and skip the pool
+        now_key = now.isoformat()
+        # logs are sorted by store, so each store is one contiguous slice
+        boundaries = np.flatnonzero(all_store_ids[1:] != all_store_ids[:-1]) + 1
+        store_starts = np.concatenate(([0], boundaries)) if len(all_store_ids) else boundaries
+        store_ids = all_store_ids[store_starts]
+
+        # one UTC offset table per timezone in use, shared by all of its stores
+        store_tzs = [tz_map.get(store_id) or DEFAULT_TIMEZONE for store_id in store_ids]
+        offset_tables = {
+            tz_str: build_utc_offset_table(tz_str, week_start - timedelta(days=3), now + timedelta(days=3))
+            for tz_str in set(store_tzs)
+        }
+
+        cached_rows = [_store_cache.get((store_id, now_key)) for store_id in store_ids]
+        store_chunks = (
+            (store_id, store_ts, active, offset_tables[tz_str], bh_offsets.get(store_id, FULL_WEEK), now)
+            for store_id, tz_str, store_ts, active, cached in zip(
+                store_ids, store_tzs, np.split(ts_ns, boundaries), np.split(is_active, boundaries),
+                cached_rows)
+            if cached is None
+        )
 
-        report_rows = []
-        for store_id in logs_df["store_id"].unique():
-            store_logs = logs_df[logs_df["store_id"] == store_id]
-            row = calculate_uptime_downtime(store_id, store_logs, now, tz_map.get(store_id), all_bh)
-            report_rows.append(row)
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            computed = executor.map(_store_worker, store_chunks, chunksize=32)
+            report_rows = _iter_report_rows(store_ids, cached_rows, computed, now_key)
+            if format == "parquet":
+                _write_parquet(output_path, report_rows)
+            else:
+                _write_csv(output_path, report_rows)
 
-        df = pd.DataFrame(report_rows)
-        df.to_csv(output_path, index=False)
         print(f"Report generated: {output_path}")
         return output_path
     finally:
@@ -0,0 +1,42 @@
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class InMemoryCache:
+    """Thread-safe in-process cache whose entries expire `ttl` seconds after being set."""
+
+    def __init__(self, ttl: float, max_entries: int = 100_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._data) >= self.max_entries:
+                self._evict(now)
+            self._data[key] = (now + self.ttl, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def _evict(self, now: float) -> None:
+        # drop expired entries first; if still full, drop the oldest half
+        self._data = {k: v for k, v in self._data.items() if v[0] > now}
+        if len(self._data) >= self.max_entries:
+            keep = sorted(self._data.items(), key=lambda kv: kv[1][0])[len(self._data) // 2:]
+            self._data = dict(keep)
@@ -1,50 +1,62 @@
+import io
 import pandas as pd
 from sqlalchemy.orm import Session
-from datetime import datetime
 from app.db import SessionLocal, engine
 from app.models import StoreStatus, BusinessHours, StoreTimezone, Base
+from app.services.report_service import clear_max_timestamp_cache
 
 # Create tables if not exist
 Base.metadata.create_all(bind=engine)
 
+def _bulk_insert(df: pd.DataFrame, table: str, db: Session):
+    """Append df to table inside the session's transaction: COPY on Postgres, executemany INSERTs otherwise."""
+    if db.get_bind().dialect.name == "postgresql":
+        buf = io.StringIO()
+        df.to_csv(buf, index=False, header=False)
+        buf.seek(0)
+        with db.connection().connection.cursor() as cur:
+            cur.copy_expert(f"COPY {table} ({', '.join(df.columns)}) FROM STDIN CSV", buf)
+    else:
+        # pandas' default executemany beats method="multi" by ~4x on SQLite
+        df.to_sql(table, db.connection(), if_exists="append", index=False, chunksize=10_000)
+
 def load_store_status(file_path: str, db: Session):
     df = pd.read_csv(file_path)
 
-    for _, row in df.iterrows():
-        # Handle timestamp ending with ' UTC'
-        ts = str(row["timestamp_utc"]).replace(" UTC", "")
-        record = StoreStatus(
-            store_id=str(row["store_id"]),
-            timestamp_utc=datetime.strptime(ts, "%Y-%m-%d %H:%M:%S.%f"),
-            status=row["status"]
-        )
-        db.add(record)
+    # Handle timestamp ending with ' UTC'
+    df = pd.DataFrame({
+        "store_id": df["store_id"].astype(str),
+        "timestamp_utc": pd.to_datetime(
+            df["timestamp_utc"].str.removesuffix(" UTC"), format="%Y-%m-%d %H:%M:%S.%f", cache=True
+        ),
+        "status": df["status"],
+    })
+    _bulk_insert(df, StoreStatus.__tablename__, db)
     db.commit()
+    clear_max_timestamp_cache()
     print("Store status data loaded.")
 
 def load_business_hours(file_path: str, db: Session):
     df = pd.read_csv(file_path)
 
-    for _, row in df.iterrows():
-        record = BusinessHours(
-            store_id=str(row["store_id"]),
-            day_of_week=int(row["dayOfWeek"]),
-            start_time_local=datetime.strptime(row["start_time_local"], "%H:%M:%S").time(),
-            end_time_local=datetime.strptime(row["end_time_local"], "%H:%M:%S").time(),
-        )
-        db.add(record)
+    df = pd.DataFrame({
+        "store_id": df["store_id"].astype(str),
+        "day_of_week": df["dayOfWeek"].astype(int),
+        "start_time_local": pd.to_datetime(df["start_time_local"], format="%H:%M:%S", cache=True).dt.time,
+        "end_time_local": pd.to_datetime(df["end_time_local"], format="%H:%M:%S", cache=True).dt.time,
+    })
+    _bulk_insert(df, BusinessHours.__tablename__, db)
     db.commit()
     print("Business hours data loaded.")
 
 def load_store_timezone(file_path: str, db: Session):
     df = pd.read_csv(file_path)
 
-    for _, row in df.iterrows():
-        record = StoreTimezone(
-            store_id=str(row["store_id"]),
-            timezone_str=row["timezone_str"]
-        )
-        db.add(record)
+    df = pd.DataFrame({
+        "store_id": df["store_id"].astype(str),
+        "timezone_str": df["timezone_str"],
+    })
+    _bulk_insert(df, StoreTimezone.__tablename__, db)
     db.commit()
     print("Store timezone data loaded.")
 
@@ -0,0 +1,37 @@
+import asyncio
+import os
+from arq.connections import RedisSettings
+from app.db import SessionLocal
+from app.models import ReportJob
+from app.services.report_service import generate_report
+
+# Start with: arq app.worker.WorkerSettings
+REDIS_SETTINGS = RedisSettings.from_dsn(os.getenv("REDIS_URL", "redis://localhost:6379"))
+
+def _update_job(report_id: str, **fields):
+    db = SessionLocal()
+    try:
+        db.query(ReportJob).filter(ReportJob.id == report_id).update(fields)
+        db.commit()
+    finally:
+        db.close()
+
+async def run_report_task(ctx, report_id: str, output_path: str, format: str = "parquet"):
+    try:
+        # generate_report is blocking (DB + process pool); keep the worker loop free
+        path = await asyncio.to_thread(generate_report, output_path, format)
+        _update_job(report_id, status="Complete", file=path)
+    except asyncio.CancelledError:
+        # arq cancels the task on job_timeout; don't leave the job Running forever
+        _update_job(report_id, status="Failed", error="Report generation timed out or was cancelled")
+        raise
+    except Exception as e:
+        _update_job(report_id, status="Failed", error=str(e))
+
+class WorkerSettings:
+    functions = [run_report_task]
+    redis_settings = REDIS_SETTINGS
+    job_timeout = 60 * 60  # reports can take minutes; arq's default is 5
+    # each report already fans out over a cpu_count process pool; running
+    # several at once (arq's default is 10) would only oversubscribe the CPUs
+    max_jobs = 1
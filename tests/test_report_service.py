@@ -0,0 +1,147 @@
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import report_service
+
+# The NumPy path, its plain-Python loop, and whatever _overlap resolved to
+# (the Numba-compiled loop when numba is installed) must all agree.
+KERNELS = {
+    "numpy": report_service._overlap_numpy,
+    "loop": report_service._overlap_loop,
+    "default": report_service._overlap,
+}
+
+WINDOWS = [
+    ("uptime_last_hour", "downtime_last_hour", timedelta(hours=1), 60),
+    ("uptime_last_day", "downtime_last_day", timedelta(days=1), 3600),
+    ("uptime_last_week", "downtime_last_week", timedelta(weeks=1), 3600),
+]
+
+def reference(timestamps, statuses, now, tz_name, hours):
+    """Uptime/downtime computed the slow way: zoneinfo datetimes, one segment at a time.
+
+    hours maps weekday -> [(start, end)] local times; weekdays without hours are open all day.
+    """
+    tz = ZoneInfo(tz_name)
+
+    def to_utc(day, t):
+        return datetime.combine(day, t, tzinfo=tz).astimezone(timezone.utc)
+
+    segments = []
+    day = timestamps[0].astimezone(tz).date() - timedelta(days=1)
+    while day <= now.astimezone(tz).date():
+        for start, end in hours.get(day.weekday(), [(time(0), time(23, 59, 59))]):
+            if end <= start:
+                segments.append((to_utc(day, start), to_utc(day, time(23, 59, 59))))
+                segments.append((to_utc(day + timedelta(days=1), time(0)), to_utc(day + timedelta(days=1), end)))
+            else:
+                segments.append((to_utc(day, start), to_utc(day, end)))
+        day += timedelta(days=1)
+
+    # business time is the union of the segments
+    merged = []
+    for start, end in sorted(segments):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+
+    observations = list(zip(timestamps, timestamps[1:] + [now], statuses))
+    result = {}
+    for up_key, down_key, span, unit in WINDOWS:
+        up = down = 0.0
+        for obs_start, obs_end, active in observations:
+            for seg_start, seg_end in merged:
+                overlap = (min(obs_end, seg_end, now) - max(obs_start, seg_start, now - span)).total_seconds()
+                if overlap > 0:
+                    if active:
+                        up += overlap
+                    else:
+                        down += overlap
+        result[up_key] = up / unit
+        result[down_key] = down / unit
+    return result
+
+def run_report(kernel, timestamps, statuses, now, tz_name, hours):
+    rows = [
+        ("s", dow, start.hour * 3600 + start.minute * 60 + start.second, end.hour * 3600 + end.minute * 60 + end.second)
+        for dow, ranges in hours.items() for start, end in ranges
+    ]
+    week_offsets = report_service.FULL_WEEK
+    if rows:
+        bh = pd.DataFrame(rows, columns=["store_id", "day_of_week", "start_sec", "end_sec"])
+        week_offsets = report_service.build_business_hour_offsets(bh)["s"]
+    naive_now = now.replace(tzinfo=None)
+    utc_offsets = report_service.build_utc_offset_table(
+        tz_name, naive_now - timedelta(days=10), naive_now + timedelta(days=3))
+    ts_ns = np.array([pd.Timestamp(ts).value for ts in timestamps], dtype=np.int64)
+    kernel_before, report_service._overlap = report_service._overlap, kernel
+    try:
+        return report_service.calculate_uptime_downtime(
+            "s", ts_ns, np.array(statuses), naive_now, utc_offsets, week_offsets)
+    finally:
+        report_service._overlap = kernel_before
+
+def observations(now, seed, step_minutes=(20, 200)):
+    rng = np.random.default_rng(seed)
+    timestamps, t = [], now - timedelta(days=9)
+    while t < now:
+        timestamps.append(t)
+        t += timedelta(minutes=int(rng.integers(*step_minutes)), seconds=int(rng.integers(60)))
+    return timestamps, [bool(active) for active in rng.random(len(timestamps)) < 0.7]
+
+CASES = {
+    # the week covers the 2023-03-12 spring-forward change in every zone below
+    "dst_business_hours": ("2023-03-15 10:00:00", "America/Chicago",
+                           {dow: [(time(9), time(21, 30))] for dow in range(7)}),
+    "dst_open_all_day": ("2023-03-15 10:00:00", "America/New_York", {}),
+    "dst_two_ranges": ("2023-03-13 23:30:00", "America/Denver",
+                       {dow: [(time(9), time(12)), (time(13), time(21))] for dow in range(7)}),
+    "cross_midnight": ("2023-01-25 18:13:22", "America/Chicago",
+                       {dow: [(time(18), time(2))] for dow in range(7)}),
+    "cross_midnight_fixed_offset": ("2023-01-25 18:13:22", "Asia/Kolkata",
+                                    {dow: [(time(22), time(6))] for dow in range(7)}),
+    "missing_weekday": ("2023-01-25 18:13:22", "America/Los_Angeles",
+                        {dow: [(time(10), time(20))] for dow in range(7) if dow != 3}),
+}
+
+@pytest.mark.parametrize("kernel", KERNELS.values(), ids=KERNELS.keys())
+@pytest.mark.parametrize("case", CASES.values(), ids=CASES.keys())
+def test_calculate_uptime_downtime_matches_reference(case, kernel):
+    now_str, tz_name, hours = case
+    now = datetime.fromisoformat(now_str).replace(tzinfo=timezone.utc)
+    for seed in range(3):
+        timestamps, statuses = observations(now, seed)
+        expected = reference(timestamps, statuses, now, tz_name, hours)
+        got = run_report(kernel, timestamps, statuses, now, tz_name, hours)
+        for key, value in expected.items():
+            assert got[key] == pytest.approx(value, abs=1e-5), (seed, key)
+
+@pytest.mark.parametrize("kernel", KERNELS.values(), ids=KERNELS.keys())
+def test_dst_week_counts_real_hours(kernel):
+    # always active and always open: the window is 168 real hours even though local
+    # clocks move 169 across spring-forward; only the 23:59:59-00:00 second is closed
+    now = datetime(2023, 3, 15, 10, tzinfo=timezone.utc)
+    timestamps = [now - timedelta(days=8)]
+    got = run_report(kernel, timestamps, [True], now, "America/Chicago", {})
+    assert got["downtime_last_week"] == 0
+    assert got["uptime_last_week"] == pytest.approx(168 - 7 / 3600, abs=1e-5)
+
+@pytest.mark.parametrize("kernel", KERNELS.values(), ids=KERNELS.keys())
+def test_overlapping_business_hours_count_once(kernel):
+    # Monday 20:00-02:00 spills into Tuesday, which lists no hours and so is open all
+    # day as well; overlapping listed ranges must not double count either
+    now = datetime(2023, 1, 25, 18, 13, 22, tzinfo=timezone.utc)
+    timestamps = [now - timedelta(days=8)]
+    for hours, expected in [
+        ({0: [(time(20), time(2))]}, 148),
+        ({dow: [(time(9), time(17)), (time(12), time(20))] for dow in range(7)}, 7 * 11),
+    ]:
+        got = run_report(kernel, timestamps, [True], now, "America/Chicago", hours)
+        assert got["uptime_last_week"] == pytest.approx(
+            reference(timestamps, [True], now, "America/Chicago", hours)["uptime_last_week"], abs=1e-5)
+        assert got["uptime_last_week"] == pytest.approx(expected, abs=0.01)